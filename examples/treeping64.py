@@ -3,8 +3,9 @@
 "Create a 64-node tree network, and test connectivity using ping."
 
 from mininet.log import setLogLevel
+from mininet.net import Mininet
 from mininet.node import UserSwitch, OVSKernelSwitch  # , KernelSwitch
-from mininet.topolib import TreeNet
+from mininet.topolib import TreeTopo
 
 def treePing64():
     "Run ping test on 64-node tree networks."
@@ -14,10 +15,13 @@ def treePing64():
                   'reference user': UserSwitch,
                   'Open vSwitch kernel': OVSKernelSwitch }
 
+    # Build the 64-node tree once and reuse it for every datapath
+    topo = TreeTopo( depth=2, fanout=8 )
+
     for name in switches:
         print "*** Testing", name, "datapath"
         switch = switches[ name ]
-        network = TreeNet( depth=2, fanout=8, switch=switch )
+        network = Mininet( topo, switch=switch )
         result = network.run( network.pingAll )
         results[ name ] = result
 
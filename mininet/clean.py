@@ -10,7 +10,7 @@ It may also get rid of 'false positives', but hopefully
 nothing irreplaceable!
 """
 
-from subprocess import ( Popen, PIPE, check_output as co,
+from subprocess import ( Popen, PIPE, STDOUT, check_output as co,
                          CalledProcessError )
 import time
 import subprocess
@@ -18,6 +18,7 @@ import os
 import glob
 
 from mininet.log import info
+from mininet.moduledeps import lsmod
 from mininet.term import cleanUpScreens
 
 def sh( cmd ):
@@ -80,13 +81,9 @@ class Cleanup( object ):
         
         info( "***  Removing WiFi module and Configurations\n" )
         
-        try:
-            (subprocess.check_output("lsmod | grep mac80211_hwsim",
-                                                          shell=True))
+        if 'mac80211_hwsim' in lsmod():
             os.system( 'rmmod mac80211_hwsim' )
-        except:
-            pass
-        
+
         try:
             h = sh('ps -aux | grep -ic hostpad')
             if h >= 2:
@@ -120,12 +117,14 @@ class Cleanup( object ):
         links = sh( "ip link show | "
                     "egrep -o '([-_.[:alnum:]]+-eth[[:digit:]]+)'"
                     ).splitlines()
-        # Delete blocks of links
-        n = 1000  # chunk size
-        for i in xrange( 0, len( links ), n ):
-            cmd = ';'.join( 'ip link del %s' % link
-                             for link in links[ i : i + n ] )
-            sh( '( %s ) 2> /dev/null' % cmd )
+        if links:
+            # Feed all deletions to one 'ip -batch' process instead of
+            # forking ip per link; -force skips links that are already
+            # gone (e.g. the peer of a previously deleted veth)
+            popen = Popen( [ 'ip', '-force', '-batch', '-' ],
+                           stdin=PIPE, stdout=PIPE, stderr=STDOUT )
+            popen.communicate( ''.join( 'link del %s\n' % link
+                                        for link in links if link ) )
 
         if 'tap9' in sh( 'ip link show' ):
             info( "*** Removing tap9 - assuming it's from cluster edition\n" )
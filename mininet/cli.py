@@ -55,8 +55,6 @@ class CLI(Cmd):
         self.locals = { 'net': mininet }
         # Attempt to handle input
         self.stdin = stdin
-        self.inPoller = poll()
-        self.inPoller.register(stdin)
         self.inputFile = script
 
 
@@ -159,10 +157,21 @@ class CLI(Cmd):
         "List network connections."
         dumpNodeConnections(self.mn.values())
 
+    # Characters that need interpretation by a real shell
+    shellChars = frozenset('|&;<>()$`\\"\'*?[]{}~#=\n')
+
     def do_sh(self, line):
         """Run an external shell command
            Usage: sh [cmd args]"""
         assert self  # satisfy pylint and allow override
+        args = line.split()
+        if args and not self.shellChars.intersection(line):
+            # Simple command: skip the /bin/sh fork and exec directly
+            try:
+                call(args)
+                return
+            except OSError:
+                pass  # probably a shell builtin; fall through
         call(line, shell=True)
 
     # do_py() and do_px() need to catch any exception during eval()/exec()
@@ -222,14 +231,16 @@ class CLI(Cmd):
         if not args:
             self.mn.iperf()
         elif len(args) == 2:
+            nameToNode = self.mn.nameToNode
             hosts = []
             err = False
             for arg in args:
-                if arg not in self.mn:
+                host = nameToNode.get(arg)
+                if host is None:
                     err = True
                     error("node '%s' not in network\n" % arg)
                 else:
-                    hosts.append(self.mn[ arg ])
+                    hosts.append(host)
             if not err:
                 self.mn.iperf(hosts)
         else:
@@ -243,14 +254,16 @@ class CLI(Cmd):
             self.mn.iperf(l4Type='UDP')
         elif len(args) == 3:
             udpBw = args[ 0 ]
+            nameToNode = self.mn.nameToNode
             hosts = []
             err = False
             for arg in args[ 1:3 ]:
-                if arg not in self.mn:
+                host = nameToNode.get(arg)
+                if host is None:
                     err = True
                     error("node '%s' not in network\n" % arg)
                 else:
-                    hosts.append(self.mn[ arg ])
+                    hosts.append(host)
             if not err:
                 self.mn.iperf(hosts, l4Type='UDP', udpBw=udpBw)
         else:
@@ -259,14 +272,14 @@ class CLI(Cmd):
 
     def do_intfs(self, _line):
         "List interfaces."
-        for node in self.mn.values():
-            output('%s: %s\n' %
-                    (node.name, ','.join(node.intfNames())))
+        output(''.join('%s: %s\n' %
+                        (node.name, ','.join(node.intfNames()))
+                        for node in self.mn.values()))
 
     def do_dump(self, _line):
         "Dump node info."
-        for node in self.mn.values():
-            output('%s\n' % repr(node))
+        output(''.join('%s\n' % repr(node)
+                        for node in self.mn.values()))
 
     def do_info(self, line):
         "Noise node info."
@@ -420,6 +433,14 @@ class CLI(Cmd):
                 error('invalid command: '
                        'switch <switch name> {start, stop}\n')
 
+    @staticmethod
+    def nodeIP(node):
+        """Return a node's default IP address, preferring the cached
+           value and only shelling out via updateIP() when none is
+           cached (e.g. the address was changed behind our back)."""
+        intf = node.defaultIntf()
+        return intf.IP() or intf.updateIP()
+
     def default(self, line):
         """Called on an input line when the command prefix is not recognized.
         Overridden to run shell commands when a node is the first CLI argument.
@@ -428,19 +449,22 @@ class CLI(Cmd):
 
         first, args, line = self.parseline(line)
 
-        if first in self.mn:
+        # Single dict probe rather than a membership test plus lookup
+        node = self.mn.nameToNode.get(first)
+        if node:
             if not args:
                 print "*** Enter a command for node: %s <cmd>" % first
                 return
-            node = self.mn[ first ]
+            # Split on single spaces: the empty tokens from whitespace
+            # runs survive the substitution below, so sendCmd()'s
+            # ' '.join rebuilds the command line byte-for-byte
             rest = args.split(' ')
             # Substitute IP addresses for node names in command
-            # If updateIP() returns None, then use node name
-            rest = [ self.mn[ arg ].defaultIntf().updateIP() or arg
+            # If the node has no IP address, then use node name
+            rest = [ self.nodeIP(self.mn[ arg ]) or arg
                      if arg in self.mn else arg
                      for arg in rest ]
-            rest = ' '.join(rest)
-            # Run cmd on node:
+            # Run cmd on node; sendCmd() joins the list itself
             node.sendCmd(rest)
             self.waitForNode(node)
         else:
@@ -448,34 +472,37 @@ class CLI(Cmd):
 
     def waitForNode(self, node):
         "Wait for a node to finish, and print its output."
-        # Pollers
-        nodePoller = poll()
-        nodePoller.register(node.stdout)
+        # Poll stdin and the node's output together, and dispatch on
+        # the fds that poll() itself reports as readable, rather than
+        # re-polling each one separately afterwards
+        stdinFd = self.stdin.fileno()
+        nodeFd = node.stdout.fileno()
         bothPoller = poll()
-        bothPoller.register(self.stdin, POLLIN)
-        bothPoller.register(node.stdout, POLLIN)
+        bothPoller.register(stdinFd, POLLIN)
+        bothPoller.register(nodeFd, POLLIN)
         if self.isatty():
             # Buffer by character, so that interactive
             # commands sort of work
             quietRun('stty -icanon min 1')
-        while True:
+        # Bind bound methods to locals; the attribute lookups add up
+        # at one poll wakeup per keystroke or output chunk
+        stdinRead, nodeWrite = self.stdin.read, node.write
+        nodeMonitor, pollBoth = node.monitor, bothPoller.poll
+        while node.waiting:
             try:
-                bothPoller.poll()
-                # XXX BL: this doesn't quite do what we want.
-                if False and self.inputFile:
-                    key = self.inputFile.read(1)
-                    if key is not '':
-                        node.write(key)
-                    else:
-                        self.inputFile = None
-                if isReadable(self.inPoller):
-                    key = self.stdin.read(1)
-                    node.write(key)
-                if isReadable(nodePoller):
-                    data = node.monitor()
-                    output(data)
-                if not node.waiting:
-                    break
+                # The handler lives outside the poll loop, so the
+                # per-wakeup path carries no exception setup; an
+                # interrupt drops us out here and we resume polling
+                while node.waiting:
+                    for fd, event in pollBoth():
+                        if not event & POLLIN:
+                            continue
+                        if fd == stdinFd:
+                            nodeWrite(stdinRead(1))
+                        elif fd == nodeFd:
+                            data = nodeMonitor()
+                            if data:
+                                output(data)
             except KeyboardInterrupt:
                 # There is an at least one race condition here, since
                 # it's possible to interrupt ourselves after we've
@@ -487,12 +514,3 @@ class CLI(Cmd):
         if '#' in line:
             line = line.split('#')[ 0 ]
         return line
-
-# Helper functions
-
-def isReadable(poller):
-    "Check whether a Poll object has a readable fd."
-    for fdmask in poller.poll(0):
-        mask = fdmask[ 1 ]
-        if mask & POLLIN:
-            return True
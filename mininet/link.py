@@ -587,15 +587,15 @@ class Link(object):
         # Leave this as an instance method for now
         assert self
         if 'phywlan' in node.params:  # if physical Interface
-            return ifacename + repr(n)
+            return '%s%d' % (ifacename, n)
         else:
-            return node.name + '-' + ifacename + repr(n)
+            return '%s-%s%d' % (node.name, ifacename, n)
 
     def intfName(self, node, n):
         "Construct a canonical interface name node-ethN for interface n."
         # Leave this as an instance method for now
         assert self
-        return node.name + '-eth' + repr(n)
+        return '%s-eth%d' % (node.name, n)
 
     @classmethod
     def makeIntfPair(cls, intfname1, intfname2, addr1=None, addr2=None,
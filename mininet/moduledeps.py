@@ -5,8 +5,14 @@ from mininet.log import info, error, debug
 from os import environ
 
 def lsmod():
-    "Return output of lsmod."
-    return quietRun('lsmod')
+    """Return a list of currently loaded kernel modules,
+       read from /proc/modules rather than forking lsmod."""
+    try:
+        with open('/proc/modules') as f:
+            return [ line.split(None, 1)[ 0 ] for line in f ]
+    except IOError:
+        # Kernel without loadable module support
+        return []
 
 def rmmod(mod):
     """Return output of lsmod.
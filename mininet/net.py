@@ -420,11 +420,14 @@ class Mininet(object):
            cls: custom host class/constructor (optional)
            params: parameters for host
            returns: added host"""
-        # Default IP and MAC addresses
-        defaults = { 'ip': ipAdd(self.nextIP,
-                                  ipBaseNum=self.ipBaseNum,
-                                  prefixLen=self.prefixLen) +
-                                  '/%s' % self.prefixLen }
+        # Default IP and MAC addresses; don't bother formatting a
+        # default IP that a caller-supplied one would overwrite
+        defaults = {}
+        if 'ip' not in params:
+            defaults[ 'ip' ] = (ipAdd(self.nextIP,
+                                       ipBaseNum=self.ipBaseNum,
+                                       prefixLen=self.prefixLen) +
+                                '/%s' % self.prefixLen)
         if self.autoSetMacs:
             defaults[ 'mac' ] = macColonHex(self.nextIP)
         if self.autoPinCpus:
@@ -446,11 +449,14 @@ class Mininet(object):
            cls: custom host class/constructor (optional)
            params: parameters for host
            returns: added host"""
-        # Default IP and MAC addresses
-        defaults = { 'ip': ipAdd(self.nextIP,
-                                  ipBaseNum=self.ipBaseNum,
-                                  prefixLen=self.prefixLen) +
-                                  '/%s' % self.prefixLen}
+        # Default IP and MAC addresses; don't bother formatting a
+        # default IP that a caller-supplied one would overwrite
+        defaults = {}
+        if 'ip' not in params:
+            defaults[ 'ip' ] = (ipAdd(self.nextIP,
+                                       ipBaseNum=self.ipBaseNum,
+                                       prefixLen=self.prefixLen) +
+                                '/%s' % self.prefixLen)
 
         defaults['antennaGain'] = []
         defaults['antennaHeight'] = []
@@ -532,11 +538,14 @@ class Mininet(object):
            cls: custom host class/constructor (optional)
            params: parameters for host
            returns: added host"""
-        # Default IP and MAC addresses
-        defaults = { 'ip': ipAdd(self.nextIP,
-                                  ipBaseNum=self.ipBaseNum,
-                                  prefixLen=self.prefixLen) +
-                                  '/%s' % self.prefixLen}
+        # Default IP and MAC addresses; don't bother formatting a
+        # default IP that a caller-supplied one would overwrite
+        defaults = {}
+        if 'ip' not in params:
+            defaults[ 'ip' ] = (ipAdd(self.nextIP,
+                                       ipBaseNum=self.ipBaseNum,
+                                       prefixLen=self.prefixLen) +
+                                '/%s' % self.prefixLen)
 
         defaults['antennaGain'] = []
         defaults['antennaHeight'] = []
@@ -1491,9 +1500,15 @@ class Mininet(object):
 
     def confirmAdhocAssociation(self, sta, iface, wlan):
         associated = ''
+        # Poll with exponential backoff rather than re-running the
+        # scan flat out until the ssid shows up
+        delay = 0.05
         while(associated == '' or len(associated) == 0):
             sta.sendCmd("iw dev %s scan ssid | grep %s" % (iface, sta.ssid[wlan]))
             associated = sta.waitOutput()
+            if not associated:
+                sleep(delay)
+                delay = min(delay * 2, 0.5)
         sta.params['frequency'][wlan] = channelParameters.frequency(sta, wlan)
 
     def startTerms(self):
@@ -1643,14 +1658,51 @@ class Mininet(object):
             if not ready and timeoutms >= 0:
                 yield None, None
 
+    def _collect(self, nodes):
+        """Wait in parallel for commands to complete on a set of nodes,
+           which must have been sent a command via sendCmd().
+           nodes: list of nodes
+           returns: dict of node -> command output"""
+        nodes = [ node for node in nodes if node.waiting ]
+        if not nodes:
+            return {}
+        chunks = dict((node, []) for node in nodes)
+        # epoll scales better than poll() when many hosts are pending;
+        # fall back to poll() where it isn't available
+        if hasattr(select, 'epoll'):
+            poller, pollin = select.epoll(), select.EPOLLIN
+        else:
+            poller, pollin = select.poll(), select.POLLIN
+        for node in nodes:
+            poller.register(node.stdout, pollin)
+        n1 = nodes[ 0 ]  # so we can call class method fdToNode
+        remaining = len(nodes)
+        while remaining:
+            for fd, _event in poller.poll():
+                node = n1.fdToNode(fd)
+                chunks[ node ].append(node.monitor(timeoutms=0))
+                if not node.waiting:
+                    poller.unregister(node.stdout)
+                    remaining -= 1
+        if hasattr(poller, 'close'):
+            poller.close()
+        return dict((node, ''.join(data))
+                     for node, data in chunks.iteritems())
+
+    # Output-parsing patterns, compiled once rather than per call
+    _pingRegex = re.compile(r'(\d+) packets transmitted, (\d+) received')
+    _unreachableRegex = re.compile(r'[uU]nreachable')
+    _rttRegex = re.compile(r'rtt min/avg/max/mdev = '
+                            r'(\d+\.\d+)/(\d+\.\d+)/(\d+\.\d+)/(\d+\.\d+) ms')
+    _iperfRegex = re.compile(r'([\d\.]+ \w+/sec)')
+
     @staticmethod
     def _parsePing(pingOutput):
         "Parse ping output and return packets sent, received."
         # Check for downed link
         if 'connect: Network is unreachable' in pingOutput:
             return 1, 0
-        r = r'(\d+) packets transmitted, (\d+) received'
-        m = re.search(r, pingOutput)
+        m = Mininet._pingRegex.search(pingOutput)
         if m is None:
             error('*** Error: could not parse ping output: %s\n' %
                    pingOutput)
@@ -1670,23 +1722,51 @@ class Mininet(object):
         if not hosts:
             hosts = self.hosts
             output('*** Ping: testing ping reachability\n')
+        opts = ''
+        if timeout:
+            opts = '-W %s' % timeout
+        # Look up each destination address once, not once per source
+        ipOf = dict((host, host.IP()) for host in hosts if host.intfs)
+        # Each host pings all of its destinations from a single compound
+        # shell command, and every host runs its pings in parallel
+        results, raw, pings = {}, {}, {}
+        for node in hosts:
+            dests = []
+            for dest in hosts:
+                if node == dest:
+                    continue
+                if not dest.intfs:
+                    results[ node, dest ] = (0, 0)
+                elif not ipOf[ dest ]:
+                    # Interface without an address: count as lost,
+                    # as the baseline's failed 'ping None' did
+                    results[ node, dest ] = (1, 0)
+                else:
+                    dests.append(dest)
+            if not dests:
+                continue
+            # The separator must not occur in ping output ('---' would
+            # match ping's own '--- <ip> ping statistics ---' header)
+            node.sendCmd('for ip in %s; do ping -c1 %s $ip; '
+                          'echo __MN_SEP__; done' %
+                          (' '.join(ipOf[ dest ] for dest in dests), opts))
+            pings[ node ] = dests
+        collected = self._collect(list(pings))
+        for node, dests in pings.iteritems():
+            result = collected[ node ]
+            debug(result)
+            for dest, segment in zip(dests, result.split('__MN_SEP__')):
+                results[ node, dest ] = self._parsePing(segment)
+                raw[ node, dest ] = segment
         for node in hosts:
             output('%s -> ' % node.name)
             for dest in hosts:
                 if node != dest:
-                    opts = ''
-                    if timeout:
-                        opts = '-W %s' % timeout
-                    if dest.intfs:
-                        result = node.cmdPrint('ping -c1 %s %s' %
-                                           (opts, dest.IP()))
-                        sent, received = self._parsePing(result)
-                    else:
-                        sent, received = 0, 0
+                    sent, received = results[ node, dest ]
                     packets += sent
                     if received > sent:
                         error('*** Error: received too many packets')
-                        error('%s' % result)
+                        error('%s' % raw[ node, dest ])
                         node.cmdPrint('route')
                         exit(1)
                     lost += sent - received
@@ -1707,20 +1787,16 @@ class Mininet(object):
         "Parse ping output and return all data."
         errorTuple = (1, 0, 0, 0, 0, 0)
         # Check for downed link
-        r = r'[uU]nreachable'
-        m = re.search(r, pingOutput)
+        m = Mininet._unreachableRegex.search(pingOutput)
         if m is not None:
             return errorTuple
-        r = r'(\d+) packets transmitted, (\d+) received'
-        m = re.search(r, pingOutput)
+        m = Mininet._pingRegex.search(pingOutput)
         if m is None:
             error('*** Error: could not parse ping output: %s\n' %
                    pingOutput)
             return errorTuple
         sent, received = int(m.group(1)), int(m.group(2))
-        r = r'rtt min/avg/max/mdev = '
-        r += r'(\d+\.\d+)/(\d+\.\d+)/(\d+\.\d+)/(\d+\.\d+) ms'
-        m = re.search(r, pingOutput)
+        m = Mininet._rttRegex.search(pingOutput)
         if m is None:
             if received == 0:
                 return errorTuple
@@ -1744,6 +1820,8 @@ class Mininet(object):
         if not hosts:
             hosts = self.hosts
             output('*** Ping: testing ping reachability\n')
+        # Look up each destination address once, not once per source
+        ipOf = dict((host, host.IP()) for host in hosts)
         for node in hosts:
             output('%s -> ' % node.name)
             for dest in hosts:
@@ -1751,19 +1829,23 @@ class Mininet(object):
                     opts = ''
                     if timeout:
                         opts = '-W %s' % timeout
-                    result = node.cmd('ping -c1 %s %s' % (opts, dest.IP()))
+                    result = node.cmd('ping -c1 %s %s' %
+                                       (opts, ipOf[ dest ]))
                     outputs = self._parsePingFull(result)
                     sent, received, rttmin, rttavg, rttmax, rttdev = outputs
                     all_outputs.append((node, dest, outputs))
                     output(('%s ' % dest.name) if received else 'X ')
             output('\n')
-        output("*** Results: \n")
+        # Format the whole results block and emit it in one call
+        lines = [ "*** Results: \n" ]
         for outputs in all_outputs:
             src, dest, ping_outputs = outputs
             sent, received, rttmin, rttavg, rttmax, rttdev = ping_outputs
-            output(" %s->%s: %s/%s, " % (src, dest, sent, received))
-            output("rtt min/avg/max/mdev %0.3f/%0.3f/%0.3f/%0.3f ms\n" %
-                    (rttmin, rttavg, rttmax, rttdev))
+            lines.append(" %s->%s: %s/%s, "
+                          "rtt min/avg/max/mdev %0.3f/%0.3f/%0.3f/%0.3f ms\n"
+                          % (src, dest, sent, received,
+                             rttmin, rttavg, rttmax, rttdev))
+        output(''.join(lines))
         return all_outputs
 
     # def checkAdHocConn( self, node1, node2 ):
@@ -1802,8 +1884,7 @@ class Mininet(object):
         """Parse iperf output and return bandwidth.
            iperfOutput: string
            returns: result string"""
-        r = r'([\d\.]+ \w+/sec)'
-        m = re.findall(r, iperfOutput)
+        m = Mininet._iperfRegex.findall(iperfOutput)
         if m:
             return m[-1]
         else:
@@ -1840,12 +1921,13 @@ class Mininet(object):
         if fmt:
             iperfArgs += '-f %s ' % fmt
         server.sendCmd(iperfArgs + '-s')
+        serverIP = server.IP()
         if l4Type == 'TCP':
-            if not waitListening(client, server.IP(), port):
+            if not waitListening(client, serverIP, port):
                 raise Exception('Could not connect to iperf on port %d'
                                  % port)
         cliout = client.cmd(iperfArgs + '-t %d -c ' % seconds +
-                             server.IP() + ' ' + bwArgs)
+                             serverIP + ' ' + bwArgs)
         debug('Client output: %s\n' % cliout)
         server.sendInt()
         servout = server.waitOutput()
@@ -2205,13 +2287,18 @@ class MininetWithControlNet(Mininet):
             switch.setHostRoute(cip, sintf)
         info('\n')
         info('*** Testing control network\n')
+        # Poll with exponential backoff rather than a fixed 1s sleep
+        delay = 0.01
         while not cintf.isUp():
             info('*** Waiting for', cintf, 'to come up\n')
-            sleep(1)
+            sleep(delay)
+            delay = min(delay * 2, 1)
         for switch in self.switches:
+            delay = 0.01
             while not sintf.isUp():
                 info('*** Waiting for', sintf, 'to come up\n')
-                sleep(1)
+                sleep(delay)
+                delay = min(delay * 2, 1)
             if self.ping(hosts=[ switch, controller ]) != 0:
                 error('*** Error: control network test failed\n')
                 exit(1)
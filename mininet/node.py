@@ -63,7 +63,7 @@ from time import sleep
 
 from mininet.log import info, error, warn, debug
 from mininet.util import (quietRun, errRun, errFail, moveIntf, isShellBuiltin,
-                           numCores, retry, mountCgroups)
+                           numCores, retry, mountCgroups, enlargePipe)
 from mininet.moduledeps import moduleDeps, pathCheck, TUN
 from mininet.link import Link, Intf, TCIntf, OVSIntf
 from re import findall
@@ -139,10 +139,11 @@ class Node(object):
 
         # Make pylint happy
         (self.shell, self.execed, self.pid, self.stdin, self.stdout,
-            self.lastPid, self.lastCmd, self.pollOut) = (
-                None, None, None, None, None, None, None, None)
+            self.lastPid, self.lastCmd) = (
+                None, None, None, None, None, None, None)
         self.waiting = False
         self.readbuf = ''
+        self._pendingPrompts = 0  # prompts still due from cmdBg()
 
         # Start command interpreter shell
         self.startShell()
@@ -153,6 +154,12 @@ class Node(object):
     inToNode = {}  # mapping of input fds to nodes
     outToNode = {}  # mapping of output fds to nodes
 
+    # Single poller shared by all nodes, so that we keep one
+    # registration per node rather than one poll object per node.
+    # A wakeup for another node's fd is harmless: os.read() on our
+    # own (blocking) fd simply waits until our data arrives.
+    pollOut = select.poll()
+
     @classmethod
     def fdToNode(cls, fd):
         """Return node corresponding to given file descriptor.
@@ -188,8 +195,7 @@ class Node(object):
         self.stdin = os.fdopen(master, 'rw')
         self.stdout = self.stdin
         self.pid = self.shell.pid
-        self.pollOut = select.poll()
-        self.pollOut.register(self.stdout)
+        self.pollOut.register(self.stdout, select.POLLIN)
         # Maintain mapping between file descriptors and nodes
         # This is useful for monitoring multiple nodes
         # using select.poll()
@@ -338,7 +344,13 @@ class Node(object):
         associated = ''
         if self.printCon:
             print "Associating %s to %s" % (sta, ap)
+        # Poll with exponential backoff rather than re-running iw
+        # flat out while the association completes
+        delay = 0.05
         while(associated == '' or len(associated[0]) == 15):
+            if associated != '':
+                sleep(delay)
+                delay = min(delay * 2, 0.5)
             associated = self.isAssociated(sta, wlan)
         sta.params['frequency'][wlan] = channelParameters.frequency(ap, 0)
         ap.associatedStations.append(sta)
@@ -388,6 +400,13 @@ class Node(object):
         # for intfName in self.intfNames():
         # if self.name in intfName:
         # quietRun( 'ip link del ' + intfName )
+        # Drop our fd from the shared poller so that a dead shell
+        # doesn't wake up everyone else's waitReadable()
+        if self.stdout:
+            try:
+                self.pollOut.unregister(self.stdout)
+            except KeyError:
+                pass
         self.shell = None
 
     # Subshell I/O, commands and control
@@ -485,7 +504,7 @@ class Node(object):
            timeoutms: timeout in ms or None to wait indefinitely
            findPid: look for PID from mnexec -p"""
         self.waitReadable(timeoutms)
-        data = self.read(1024)
+        data = self.read(65536)
         pidre = r'\[\d+\] \d+\r\n'
         # Look for PID
         marker = chr(1) + r'\d+\r\n'
@@ -495,18 +514,23 @@ class Node(object):
                 data = re.sub(pidre, '', data)
             # Marker can be read in chunks; continue until all of it is read
             while not re.findall(marker, data):
-                data += self.read(1024)
+                data += self.read(65536)
             markers = re.findall(marker, data)
             if markers:
                 self.lastPid = int(markers[ 0 ][ 1: ])
                 data = re.sub(marker, '', data)
-        # Look for sentinel/EOF
-        if len(data) > 0 and data[ -1 ] == chr(127):
+        # Consume prompts left over from cmdBg() commands
+        while self._pendingPrompts and chr(127) in data:
+            data = data.replace(chr(127), '', 1)
+            self._pendingPrompts -= 1
+        # Look for sentinel/EOF with a single scan
+        pos = data.find(chr(127))
+        if pos >= 0:
             self.waiting = False
-            data = data[ :-1 ]
-        elif chr(127) in data:
-            self.waiting = False
-            data = data.replace(chr(127), '')
+            if pos == len(data) - 1:
+                data = data[ :-1 ]
+            else:
+                data = data.replace(chr(127), '')
         return data
 
     def waitOutput(self, verbose=False, findPid=True):
@@ -516,12 +540,12 @@ class Node(object):
            the output, including trailing newline.
            verbose: print output interactively"""
         log = info if verbose else debug
-        output = ''
+        chunks = []
         while self.waiting:
             data = self.monitor(findPid=findPid)
-            output += data
+            chunks.append(data)
             log(data)
-        return output
+        return ''.join(chunks)
 
     def cmd(self, *args, **kwargs):
         """Send a command, wait for output, and return it.
@@ -541,6 +565,17 @@ class Node(object):
            cmd: string"""
         return self.cmd(*args, **{ 'verbose': True })
 
+    def cmdBg(self, *args, **kwargs):
+        """Fire and forget a command (usually a backgrounded daemon)
+           whose output we don't care about, without waiting for the
+           shell to come back to its prompt; monitor() quietly consumes
+           the leftover prompt sentinel later. Saves a shell round trip
+           per daemon launch.
+           args: command and arguments, or string"""
+        self.sendCmd(*args, **kwargs)
+        self.waiting = False
+        self._pendingPrompts += 1
+
     def popen(self, *args, **kwargs):
         """Return a Popen() object in our namespace
            args: Popen() args, single list, or string
@@ -574,6 +609,8 @@ class Node(object):
            returns: out, err, exitcode"""
         popen = self.popen(*args, stdin=PIPE, stdout=PIPE, stderr=PIPE,
                             **kwargs)
+        enlargePipe(popen.stdout)
+        enlargePipe(popen.stderr)
         # Warning: this can fail with large numbers of fds!
         out, err = popen.communicate()
         exitcode = popen.wait()
@@ -679,14 +716,17 @@ class Node(object):
         """Add an ARP entry.
            ip: IP address as string
            mac: MAC address as string"""
-        result = self.cmd('arp', '-s', ip, mac)
-        return result
+        # pexec avoids a round trip through the node's shell
+        result, err, _code = self.pexec('arp', '-s', ip, mac)
+        return result + err
 
     def setHostRoute(self, ip, intf):
         """Add route to host.
            ip: IP address as dotted decimal
            intf: string, interface name"""
-        return self.cmd('route add -host', ip, 'dev', intf)
+        result, err, _code = self.pexec('route', 'add', '-host', ip,
+                                         'dev', str(intf))
+        return result + err
 
     def setDefaultRoute(self, intf=None):
         """Set the default route to go through intf.
@@ -1193,14 +1233,14 @@ class UserSwitch(Switch):
         ofdlog = '/tmp/' + self.name + '-ofd.log'
         ofplog = '/tmp/' + self.name + '-ofp.log'
         intfs = [ str(i) for i in self.intfList() if not i.IP() ]
-        self.cmd('ofdatapath -i ' + ','.join(intfs) +
-                  ' punix:/tmp/' + self.name + ' -d %s ' % self.dpid +
-                  self.dpopts +
-                  ' 1> ' + ofdlog + ' 2> ' + ofdlog + ' &')
-        self.cmd('ofprotocol unix:/tmp/' + self.name +
-                  ' ' + clist +
-                  ' --fail=closed ' + self.opts +
-                  ' 1> ' + ofplog + ' 2>' + ofplog + ' &')
+        self.cmdBg('ofdatapath -i ' + ','.join(intfs) +
+                    ' punix:/tmp/' + self.name + ' -d %s ' % self.dpid +
+                    self.dpopts +
+                    ' 1> ' + ofdlog + ' 2> ' + ofdlog + ' &')
+        self.cmdBg('ofprotocol unix:/tmp/' + self.name +
+                    ' ' + clist +
+                    ' --fail=closed ' + self.opts +
+                    ' 1> ' + ofplog + ' 2>' + ofplog + ' &')
         if "no-slicing" not in self.dpopts:
             # Only TCReapply if slicing is enable
             sleep(1)  # Allow ofdatapath to start before re-arranging qdisc's
@@ -1519,7 +1559,7 @@ class IVSSwitch(Switch):
 
         logfile = '/tmp/ivs.%s.log' % self.name
 
-        self.cmd(' '.join(args) + ' >' + logfile + ' 2>&1 </dev/null &')
+        self.cmdBg(' '.join(args) + ' >' + logfile + ' 2>&1 </dev/null &')
 
     def stop(self, deleteIntfs=True):
         """Terminate IVS switch.
@@ -1564,14 +1604,18 @@ class Controller(Node):
                        ip=ip, **params)
         self.checkListening()
 
+    _telnetFound = False  # class var: have we verified telnet is installed?
+
     def checkListening(self):
         "Make sure no controllers are running on our port"
-        # Verify that Telnet is installed first:
-        out, _err, returnCode = errRun("which telnet")
-        if 'telnet' not in out or returnCode != 0:
-            raise Exception("Error running telnet to check for listening "
-                             "controllers; please check that it is "
-                             "installed.")
+        # Verify that Telnet is installed first (once, not per controller):
+        if not Controller._telnetFound:
+            out, _err, returnCode = errRun("which telnet")
+            if 'telnet' not in out or returnCode != 0:
+                raise Exception("Error running telnet to check for listening "
+                                 "controllers; please check that it is "
+                                 "installed.")
+            Controller._telnetFound = True
         listening = self.cmd("echo A | telnet -e A %s %d" %
                               (self.ip, self.port))
         if 'Connected' in listening:
@@ -1589,8 +1633,8 @@ class Controller(Node):
         cout = '/tmp/' + self.name + '.log'
         if self.cdir is not None:
             self.cmd('cd ' + self.cdir)
-        self.cmd(self.command + ' ' + self.cargs % self.port +
-                  ' 1>' + cout + ' 2>' + cout + ' &')
+        self.cmdBg(self.command + ' ' + self.cargs % self.port +
+                    ' 1>' + cout + ' 2>' + cout + ' &')
         self.execed = False
 
     def stop(self, *args, **kwargs):
@@ -1613,14 +1657,21 @@ class Controller(Node):
             self.__class__.__name__, self.name,
             self.IP(), self.port, self.pid)
 
+    _available = None  # cached 'which controller' result
+
     @classmethod
     def isAvailable(cls):
         "Is controller available?"
-        return quietRun('which controller')
+        if cls._available is None:
+            cls._available = quietRun('which controller')
+        return cls._available
 
 
 class OVSController(Controller):
     "Open vSwitch controller"
+
+    _available = None  # cached controller path, probed once
+
     def __init__(self, name, **kwargs):
         kwargs.setdefault('command', self.isAvailable() or
             'ovs-controller')
@@ -1628,9 +1679,11 @@ class OVSController(Controller):
 
     @classmethod
     def isAvailable(cls):
-        return (quietRun('which ovs-controller') or
-                 quietRun('which test-controller') or
-                 quietRun('which ovs-testcontroller')).strip()
+        if cls._available is None:
+            cls._available = (quietRun('which ovs-controller') or
+                               quietRun('which test-controller') or
+                               quietRun('which ovs-testcontroller')).strip()
+        return cls._available
 
 class NOX(Controller):
     "Controller to run a NOX application."
@@ -17,19 +17,38 @@ class TreeTopo( Topo ):
         self.addTree( depth, fanout )
 
     def addTree( self, depth, fanout ):
-        """Add a subtree starting with node n.
-           returns: last node added"""
-        isSwitch = depth > 0
-        if isSwitch:
-            node = self.addSwitch( 's%s' % self.switchNum )
-            self.switchNum += 1
-            for _ in range( fanout ):
-                child = self.addTree( depth - 1, fanout )
-                self.addLink( node, child )
-        else:
+        """Add a subtree with the given depth and fanout, iteratively
+           rather than by recursion, so deep trees don't hit Python's
+           recursion limit; node and link ordering match the old
+           recursive version.
+           returns: root of the subtree"""
+        if depth <= 0:
             node = self.addHost( 'h%s' % self.hostNum )
             self.hostNum += 1
-        return node
+            return node
+        root = self.addSwitch( 's%s' % self.switchNum )
+        self.switchNum += 1
+        # Stack frames: [ node, parent, child depth, children left ]
+        stack = [ [ root, None, depth - 1, fanout ] ]
+        while stack:
+            frame = stack[ -1 ]
+            node, parent, childDepth, remaining = frame
+            if remaining:
+                frame[ 3 ] -= 1
+                if childDepth > 0:
+                    child = self.addSwitch( 's%s' % self.switchNum )
+                    self.switchNum += 1
+                    stack.append( [ child, node, childDepth - 1, fanout ] )
+                else:
+                    child = self.addHost( 'h%s' % self.hostNum )
+                    self.hostNum += 1
+                    self.addLink( node, child )
+            else:
+                # Subtree complete: link it to its parent
+                stack.pop()
+                if parent is not None:
+                    self.addLink( parent, node )
+        return root
 
 
 def TreeNet( depth=1, fanout=2, **kwargs ):
@@ -7,6 +7,7 @@ import os
 import subprocess
 import time
 from mininet.log import debug
+from mininet.moduledeps import lsmod
 from mininet.wifiMobility import mobility
 from mininet.wifiAccessPoint import accessPoint
 from subprocess import (check_output as co,
@@ -46,12 +47,8 @@ class module(object):
         if glob.glob("*.txt"):
             os.system('rm *.txt')
 
-        try:
-            subprocess.check_output("lsmod | grep mac80211_hwsim",
-                                                          shell=True)
+        if 'mac80211_hwsim' in lsmod():
             os.system('rmmod mac80211_hwsim')
-        except:
-            pass
         if mobility.apList != []:
             self.killprocs('hostapd')
         if accessPoint.wpa_supplicantIsRunning:
@@ -61,12 +58,8 @@ class module(object):
     def start(self, wifiRadios):
         """Starting environment"""
         self.killprocs('hostapd')
-        try:
-            (subprocess.check_output("lsmod | grep mac80211_hwsim",
-                                                          shell=True))
+        if 'mac80211_hwsim' in lsmod():
             os.system('rmmod mac80211_hwsim')
-        except:
-            pass
 
         physicalWlan = self.getWlanList()  # Get Phisical Wlan(s)
         self.loadModule(wifiRadios)  # Initatilize WiFi Module